@@ -4,11 +4,24 @@ AI Translation Script - Uses Google Translate (free) to pre-translate strings.
 Saves translations as ai_suggestion for human review.
 """
 
-import json
+import hashlib
+import random
+import sqlite3
 import time
 import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+import deep_translator.google
 from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests
+
+import fastjson
 
 # Force unbuffered output
 import functools
@@ -22,41 +35,291 @@ LANGUAGE_MAP = {
     'fr': 'fr',     # French
 }
 
+# Batching - several strings are sent per request, one per line
+BATCH_SIZE = 50
+BATCH_MAX_CHARS = 4500  # deep-translator rejects payloads over 5000 chars
+BATCH_SEPARATOR = '\n'
+
+# Concurrency - batches in flight at once, and the overall request rate.
+# The rate starts at REQUESTS_PER_SECOND, halves whenever Google throttles
+# us and grows by RATE_STEP after every RATE_STEP_EVERY successful requests.
+MAX_WORKERS = 16
+REQUESTS_PER_SECOND = 5
+MIN_REQUESTS_PER_SECOND = 0.5
+MAX_REQUESTS_PER_SECOND = 10
+RATE_STEP = 0.5
+RATE_STEP_EVERY = 50
+
+# Retries - exponential backoff between attempts of a single request
+MAX_TRIES = 5
+MAX_RETRY_TIME = 60  # seconds
+BACKOFF_BASE = 1     # seconds, doubled after each failed attempt
+
+# One translator per target language, shared by every call in a thread
+# (deep-translator keeps request state on the instance, so threads can't share one)
+_TRANSLATORS = threading.local()
+
+# Persistent HTTP session so connections to Google are kept alive
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS))
+
+class RateLimiter:
+    """
+    Spaces out requests across threads to at most `rate` per second,
+    adapting the rate to how the API responds.
+    """
+
+    def __init__(self, rate, min_rate, max_rate):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._successes = 0
+        self._last_throttle = None
+
+    def wait(self):
+        """Block until the caller may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def throttled(self):
+        """Halve the rate after a 429 or server error."""
+        with self._lock:
+            now = time.monotonic()
+            self._successes = 0
+            # Requests already in flight fail together - count them once
+            if self._last_throttle is not None and now - self._last_throttle < 1.0:
+                return
+            self._last_throttle = now
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self):
+        """Speed up a little after every RATE_STEP_EVERY successes."""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= RATE_STEP_EVERY:
+                self._successes = 0
+                self.rate = min(self.max_rate, self.rate + RATE_STEP)
+
+# Rate limiting - be nice to the free API
+RATE_LIMITER = RateLimiter(REQUESTS_PER_SECOND, MIN_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND)
+
+# Commit cached translations to disk every N new entries
+CACHE_COMMIT_EVERY = 100
+
+class TranslationCache:
+    """
+    Persistent cache of Google results, keyed by language and MD5 of the
+    English text. Shared by glossary terms and page strings, so a term
+    translated once is never requested again, in this run or later ones.
+    """
+
+    def __init__(self, path, lang):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lang = lang
+        self.hits = 0
+        self.misses = 0
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS translations ('
+            'lang TEXT, hash TEXT, src TEXT, dst TEXT, PRIMARY KEY (lang, hash))'
+        )
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.md5(text.encode()).hexdigest()
+
+    def get(self, text):
+        """Return the cached translation of text, or None."""
+        row = self._conn.execute(
+            'SELECT dst FROM translations WHERE lang = ? AND hash = ?',
+            (self.lang, self._hash(text))
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, text, result):
+        """Store a translation, committing every CACHE_COMMIT_EVERY inserts."""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO translations (lang, hash, src, dst) VALUES (?, ?, ?, ?)',
+            (self.lang, self._hash(text), text, result)
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= CACHE_COMMIT_EVERY:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
 def load_json(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return fastjson.load_path(path)
 
 def save_json(path, data):
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def translate_text(text, target_lang, retries=3):
-    """Translate text with retry logic."""
-    for attempt in range(retries):
+    """Save data to path, returning False if the file already matched."""
+    return fastjson.save_path_if_changed(path, data)
+
+def get_translator(target_lang):
+    """Return this thread's translator for a Google language code."""
+    if not hasattr(_TRANSLATORS, 'by_lang'):
+        _TRANSLATORS.by_lang = {}
+    translator = _TRANSLATORS.by_lang.get(target_lang)
+    if translator is None:
+        translator = GoogleTranslator(source='en', target=target_lang)
+        _TRANSLATORS.by_lang[target_lang] = translator
+    return translator
+
+@contextmanager
+def keep_alive_session():
+    """
+    Route deep-translator's HTTP calls through SESSION.
+
+    deep-translator calls requests.get() directly, which opens a new
+    connection every time, so its module-level reference is swapped
+    for the session while translating.
+    """
+    original = deep_translator.google.requests
+    deep_translator.google.requests = SESSION
+    try:
+        yield
+    finally:
+        deep_translator.google.requests = original
+
+def request_with_backoff(translator, text, max_tries=MAX_TRIES):
+    """
+    Send one translate request through the rate limiter.
+
+    Failed attempts are retried with exponential backoff (with jitter)
+    for up to max_tries attempts or MAX_RETRY_TIME seconds, after which
+    the last error is raised. Throttling and server errors also slow
+    the shared rate limiter down.
+    """
+    started = time.monotonic()
+    for attempt in range(max_tries):
+        RATE_LIMITER.wait()
         try:
-            translator = GoogleTranslator(source='en', target=target_lang)
             result = translator.translate(text)
-            return result
+        except (TooManyRequests, RequestError) as e:
+            RATE_LIMITER.throttled()
+            error = e
         except Exception as e:
-            if attempt < retries - 1:
-                time.sleep(1)  # Rate limit protection
-            else:
-                print(f"  Failed to translate: {str(e)[:50]}")
-                return None
-    return None
+            error = e
+        else:
+            RATE_LIMITER.succeeded()
+            return result
+
+        delay = BACKOFF_BASE * 2 ** attempt
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if attempt == max_tries - 1 or time.monotonic() - started + delay > MAX_RETRY_TIME:
+            raise error
+        time.sleep(delay)
 
-def translate_strings(source_strings, translations, target_lang, skip_existing=True):
+def translate_text(text, translator, retries=MAX_TRIES):
+    """Translate text with retry logic."""
+    try:
+        return request_with_backoff(translator, text, retries)
+    except Exception as e:
+        print(f"  Failed to translate: {str(e)[:50]}")
+        return None
+
+def translate_batch(texts, translator, retries=MAX_TRIES):
+    """
+    Translate several texts with a single request.
+
+    Texts are sent newline-joined and the response is split back into
+    lines. Returns None if the request keeps failing or the response
+    doesn't come back with one line per text.
+    """
+    try:
+        result = request_with_backoff(translator, BATCH_SEPARATOR.join(texts), retries)
+    except Exception:
+        return None
+
+    if not result:
+        return None
+    lines = result.split(BATCH_SEPARATOR)
+    if len(lines) != len(texts):
+        return None
+    return [line.strip() for line in lines]
+
+def iter_batches(items):
+    """Group (key, text) pairs into batches that fit in one request."""
+    batch = []
+    batch_chars = 0
+    for key, text in items:
+        if batch and (len(batch) >= BATCH_SIZE or batch_chars + len(text) > BATCH_MAX_CHARS):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append((key, text))
+        batch_chars += len(text) + len(BATCH_SEPARATOR)
+    if batch:
+        yield batch
+
+def translate_batch_items(batch, google_lang):
+    """
+    Translate one batch of (key, text) pairs, returning (key, result) pairs.
+    Falls back to one request per text when the batch fails.
+    """
+    translator = get_translator(google_lang)
+    keys = [key for key, _ in batch]
+    texts = [text for _, text in batch]
+
+    results = translate_batch(texts, translator)
+    if results is None:
+        results = [translate_text(text, translator) for text in texts]
+
+    return list(zip(keys, results))
+
+def translate_items(items, google_lang, workers=MAX_WORKERS, cache=None):
+    """
+    Translate (key, text) pairs, yielding (key, result) pairs.
+    Cached texts are yielded first; the rest are translated concurrently
+    on `workers` threads and added to the cache.
+    """
+    if cache is not None:
+        misses = []
+        for key, text in items:
+            result = cache.get(text)
+            if result is None:
+                misses.append((key, text))
+            else:
+                yield key, result
+        items = misses
+
+    texts = dict(items)
+    batches = list(iter_batches(items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for results in executor.map(lambda batch: translate_batch_items(batch, google_lang), batches):
+            for key, result in results:
+                if result and cache is not None:
+                    cache.put(texts[key], result)
+                yield key, result
+
+def translate_strings(source_strings, translations, target_lang, skip_existing=True, workers=MAX_WORKERS, cache=None):
     """Translate all strings for a language."""
     google_lang = LANGUAGE_MAP.get(target_lang, target_lang)
     total = 0
     translated = 0
     skipped = 0
 
+    # Collect strings that still need a suggestion, grouped by English text
+    # so repeated strings are only translated once
+    pending = {}
     for section_name, section_data in source_strings['sections'].items():
         for string in section_data['strings']:
             total += 1
             string_id = string['id']
-            english_text = string['en']
 
             # Skip if already has AI suggestion
             if skip_existing and string_id in translations:
@@ -64,31 +327,32 @@ def translate_strings(source_strings, translations, target_lang, skip_existing=T
                     skipped += 1
                     continue
 
-            # Translate
-            result = translate_text(english_text, google_lang)
+            pending.setdefault(string['en'], []).append(string_id)
 
-            if result:
-                if string_id not in translations:
-                    translations[string_id] = {}
+    unique_texts = [(text, text) for text in pending]
+    for english_text, result in translate_items(unique_texts, google_lang, workers, cache):
+        if not result:
+            continue
 
-                translations[string_id]['ai_suggestion'] = result
+        for string_id in pending[english_text]:
+            if string_id not in translations:
+                translations[string_id] = {}
 
-                # Only set status if not already translated by human
-                if not translations[string_id].get('text'):
-                    translations[string_id]['status'] = 'needs_review'
+            translations[string_id]['ai_suggestion'] = result
 
-                translated += 1
+            # Only set status if not already translated by human
+            if not translations[string_id].get('text'):
+                translations[string_id]['status'] = 'needs_review'
 
-                # Progress indicator
-                if translated % 50 == 0:
-                    print(f"  Translated {translated} strings...")
+            translated += 1
 
-                # Rate limiting - be nice to the free API
-                time.sleep(0.1)
+            # Progress indicator
+            if translated % 50 == 0:
+                print(f"  Translated {translated} strings... ({RATE_LIMITER.rate:g} req/s)")
 
     return total, translated, skipped
 
-def translate_glossary(glossary, translations, target_lang):
+def translate_glossary(glossary, translations, target_lang, workers=MAX_WORKERS, cache=None):
     """Translate glossary terms."""
     google_lang = LANGUAGE_MAP.get(target_lang, target_lang)
     translated = 0
@@ -96,6 +360,8 @@ def translate_glossary(glossary, translations, target_lang):
     if 'glossary' not in translations:
         translations['glossary'] = {}
 
+    # Collect terms that still need a suggestion
+    pending = []
     for category_key, category_data in glossary['categories'].items():
         terms_list = category_data.get('terms', [])
         for term_data in terms_list:
@@ -105,23 +371,29 @@ def translate_glossary(glossary, translations, target_lang):
             if term in translations['glossary'] and translations['glossary'][term].get('ai_suggestion'):
                 continue
 
-            # Translate the term
-            result = translate_text(term, google_lang)
+            pending.append((term, term))
 
-            if result:
-                if term not in translations['glossary']:
-                    translations['glossary'][term] = {}
+    for term, result in translate_items(pending, google_lang, workers, cache):
+        if result:
+            if term not in translations['glossary']:
+                translations['glossary'][term] = {}
 
-                translations['glossary'][term]['ai_suggestion'] = result
-                if not translations['glossary'][term].get('text'):
-                    translations['glossary'][term]['status'] = 'needs_review'
+            translations['glossary'][term]['ai_suggestion'] = result
+            if not translations['glossary'][term].get('text'):
+                translations['glossary'][term]['status'] = 'needs_review'
 
-                translated += 1
-                time.sleep(0.1)
+            translated += 1
 
     return translated
 
 def main():
+    parser = argparse.ArgumentParser(description='Pre-translate strings with Google Translate')
+    parser.add_argument('lang', nargs='?', help='Translate specific language only')
+    parser.add_argument('--serial', action='store_true', help='Send one request at a time')
+    args = parser.parse_args()
+
+    workers = 1 if args.serial else MAX_WORKERS
+
     script_dir = Path(__file__).parent
     data_dir = script_dir.parent / 'data'
 
@@ -137,45 +409,53 @@ def main():
     languages = list(LANGUAGE_MAP.keys())
 
     # Check for specific language argument
-    if len(sys.argv) > 1:
-        lang_arg = sys.argv[1]
-        if lang_arg in LANGUAGE_MAP:
-            languages = [lang_arg]
+    if args.lang:
+        if args.lang in LANGUAGE_MAP:
+            languages = [args.lang]
         else:
-            print(f"Unknown language: {lang_arg}")
+            print(f"Unknown language: {args.lang}")
             print(f"Available: {', '.join(LANGUAGE_MAP.keys())}")
             sys.exit(1)
 
-    for lang in languages:
-        print(f"\n{'='*50}")
-        print(f"Translating to {lang.upper()}...")
-        print('='*50)
+    with keep_alive_session():
+        for lang in languages:
+            print(f"\n{'='*50}")
+            print(f"Translating to {lang.upper()}...")
+            print('='*50)
 
-        # Load existing translations
-        trans_file = data_dir / 'translations' / f'{lang}.json'
-        if trans_file.exists():
-            translations = load_json(trans_file)
-        else:
-            translations = {'_meta': {'language': lang, 'code': lang}}
-
-        # Translate glossary first
-        print("\nTranslating glossary terms...")
-        glossary_count = translate_glossary(glossary, translations, lang)
-        print(f"  Translated {glossary_count} glossary terms")
-
-        # Translate strings
-        print("\nTranslating page strings...")
-        total, translated, skipped = translate_strings(
-            source_strings,
-            translations,
-            lang,
-            skip_existing=True
-        )
-        print(f"  Total: {total}, Translated: {translated}, Skipped: {skipped}")
-
-        # Save
-        save_json(trans_file, translations)
-        print(f"\nSaved to {trans_file}")
+            # Load existing translations
+            trans_file = data_dir / 'translations' / f'{lang}.json'
+            if trans_file.exists():
+                translations = load_json(trans_file)
+            else:
+                translations = {'_meta': {'language': lang, 'code': lang}}
+
+            cache = TranslationCache(data_dir / 'cache' / f'translations-{lang}.sqlite', lang)
+
+            # Translate glossary first
+            print("\nTranslating glossary terms...")
+            glossary_count = translate_glossary(glossary, translations, lang, workers, cache)
+            print(f"  Translated {glossary_count} glossary terms")
+
+            # Translate strings
+            print("\nTranslating page strings...")
+            total, translated, skipped = translate_strings(
+                source_strings,
+                translations,
+                lang,
+                skip_existing=True,
+                workers=workers,
+                cache=cache
+            )
+            print(f"  Total: {total}, Translated: {translated}, Skipped: {skipped}")
+            print(f"  Cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+
+            # Save
+            if save_json(trans_file, translations):
+                print(f"\nSaved to {trans_file}")
+            else:
+                print(f"\nUnchanged: {trans_file}")
 
     print("\n" + "="*50)
     print("DONE! AI suggestions added to translation files.")
@@ -4,12 +4,18 @@ Build glossary curation data from gear_optimizer code.
 Extracts game-specific terms that need consistent translation.
 """
 
-import json
 import re
 from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 
+from fastjson import iter_sections, save_path
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Paths
 SOURCE_STRINGS = Path("/Users/albertajstamper/dev/translation-portal/data/source-strings.json")
 OUTPUT = Path("/Users/albertajstamper/dev/translation-portal/site/data/glossary-curation-data.json")
@@ -58,6 +64,66 @@ TERM_CATEGORIES = {
     }
 }
 
+def _all_terms():
+    """All terms from every category, longest first."""
+    all_terms = []
+    for cat_info in TERM_CATEGORIES.values():
+        all_terms.extend(cat_info["terms"])
+
+    # Sort by length descending to match longer terms first
+    return sorted(set(all_terms), key=len, reverse=True)
+
+def _build_term_pattern():
+    """Compile one case-insensitive pattern matching any glossary term."""
+    return re.compile(r'\b(' + '|'.join(re.escape(t) for t in _all_terms()) + r')\b', re.IGNORECASE)
+
+def _build_term_automaton():
+    """Build an Aho-Corasick automaton over the lowercased glossary terms."""
+    automaton = ahocorasick.Automaton()
+    for term in _all_terms():
+        automaton.add_word(term.lower(), term.lower())
+    automaton.make_automaton()
+    return automaton
+
+TERM_PATTERN = _build_term_pattern()
+TERM_AUTOMATON = _build_term_automaton() if ahocorasick else None
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+def _on_word_boundary(text, index):
+    """Same test as regex \\b - word-ness differs on either side of index."""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+def find_terms(text):
+    """
+    Find glossary terms in text, case-insensitively on word boundaries.
+
+    Scans all terms in one pass with pyahocorasick when it's installed,
+    otherwise uses TERM_PATTERN. Both give the leftmost, longest,
+    non-overlapping matches; the automaton returns them lowercased.
+    """
+    if TERM_AUTOMATON is None:
+        return TERM_PATTERN.findall(text)
+
+    lowered = text.lower()
+    candidates = []
+    for end_index, term in TERM_AUTOMATON.iter(lowered):
+        start = end_index - len(term) + 1
+        if _on_word_boundary(lowered, start) and _on_word_boundary(lowered, end_index + 1):
+            candidates.append((start, -len(term), term))
+
+    # Keep the longest match at each position, skipping overlaps
+    matches = []
+    next_free = 0
+    for start, neg_length, term in sorted(candidates):
+        if start >= next_free:
+            matches.append(term)
+            next_free = start - neg_length
+    return matches
+
 def normalize_term(term):
     """Normalize term to title case for grouping."""
     # Special cases
@@ -84,45 +150,35 @@ def get_category(term):
 def main():
     print("Building glossary curation data from gear_optimizer...\n")
 
-    # Load source strings
-    with open(SOURCE_STRINGS) as f:
-        data = json.load(f)
-
-    # Build regex pattern from all terms
-    all_terms = []
-    for cat_info in TERM_CATEGORIES.values():
-        all_terms.extend(cat_info["terms"])
-
-    # Sort by length descending to match longer terms first
-    all_terms = sorted(set(all_terms), key=len, reverse=True)
-    pattern = r'\b(' + '|'.join(re.escape(t) for t in all_terms) + r')\b'
-
     # Find all occurrences
     term_data = defaultdict(lambda: {
         "count": 0,
         "examples": [],
-        "sections": set()
+        "sections": set(),
+        "example_texts": set()  # For skipping duplicate examples
     })
 
-    for sec_name, sec in data["sections"].items():
+    # Stream source strings one section at a time
+    for sec_name, sec in iter_sections(SOURCE_STRINGS):
         source_type = "vue" if "/vue/" in sec_name else "content"
         for s in sec["strings"]:
             text = s["en"]
-            matches = re.findall(pattern, text, re.IGNORECASE)
+            matches = find_terms(text)
             for match in matches:
-                normalized = normalize_term(match)
-                term_data[normalized]["count"] += 1
-                term_data[normalized]["sections"].add(sec_name)
+                info = term_data[normalize_term(match)]
+                info["count"] += 1
+                info["sections"].add(sec_name)
                 # Store example with context
-                if len(term_data[normalized]["examples"]) < 3:
-                    example = {
-                        "text": text[:120] + ("..." if len(text) > 120 else ""),
-                        "source": sec["source_file"],
-                        "type": source_type
-                    }
+                if len(info["examples"]) < 3:
+                    example_text = text[:120] + ("..." if len(text) > 120 else "")
                     # Avoid duplicate examples
-                    if not any(e["text"] == example["text"] for e in term_data[normalized]["examples"]):
-                        term_data[normalized]["examples"].append(example)
+                    if example_text not in info["example_texts"]:
+                        info["example_texts"].add(example_text)
+                        info["examples"].append({
+                            "text": example_text,
+                            "source": sec["source_file"],
+                            "type": source_type
+                        })
 
     # Build output structure
     terms_list = []
@@ -154,8 +210,7 @@ def main():
 
     # Save
     OUTPUT.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT, 'w') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    save_path(OUTPUT, output)
 
     print(f"Extracted {len(terms_list)} game terms\n")
     print("By category:")
@@ -11,35 +11,85 @@ Usage:
     python3 scripts/export_translations.py --dry-run # Preview without writing
 """
 
-import json
 import os
 import argparse
 from pathlib import Path
 from datetime import datetime
+from functools import reduce
+
+from fastjson import iter_sections, load_meta, load_path, save_path_if_changed
 
 # Paths
 DATA_PATH = Path("/Users/albertajstamper/dev/translation-portal/data")
 GEAR_OPTIMIZER_PATH = Path("/Users/albertajstamper/dev/gear_optimizer")
+SOURCE_STRINGS = DATA_PATH / "source-strings.json"
 
 LANGUAGES = ["ko", "es", "pt", "fr"]
 
-def load_source_strings():
-    """Load the source strings file."""
-    source_file = DATA_PATH / "source-strings.json"
-    with open(source_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Statuses that get exported
+_OK_STATUSES = frozenset({"approved", "submitted", "draft"})
+
+# Markdown string types, skipped when building simple keys
+_DROP_KEYS = frozenset({"header", "paragraph", "list_item"})
 
 def load_translations(lang):
     """Load translations for a specific language."""
     trans_file = DATA_PATH / "translations" / f"{lang}.json"
     if trans_file.exists():
-        with open(trans_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_path(trans_file)
     return {}
 
-def export_gear_optimizer(lang, translations, source_data, dry_run=False):
+def simple_key_parts(string_id):
+    """
+    Simplify a string id into vue-i18n key parts.
+
+    e.g., "vue.components.CostTables.0" -> ("CostTables", "0")
+    """
+    keys = string_id.split(".")
+
+    # Take the last meaningful parts
+    if len(keys) >= 3:
+        category = keys[-2] if keys[-2] not in _DROP_KEYS else keys[-3]
+        return (category, keys[-1])
+    return tuple(keys)
+
+def build_export_index(source_file):
+    """
+    List (string_id, english_text, parent_keys, leaf_key) for every
+    gear_optimizer string. The vue-i18n key depends only on the string id,
+    so it is worked out once per run and shared by every language.
+    """
+    index = []
+    for section_name, section_data in iter_sections(source_file):
+        if not section_name.startswith("gear_optimizer/"):
+            continue
+
+        for string_data in section_data["strings"]:
+            string_id = string_data["id"]
+            key_parts = simple_key_parts(string_id)
+            index.append((string_id, string_data["en"], key_parts[:-1], key_parts[-1]))
+    return index
+
+def keep_export_time(flat_file, flat_output):
+    """
+    Reuse the previous exported_at if nothing else in the flat export
+    changed, so an unchanged export produces an identical file.
+    """
+    if not flat_file.exists():
+        return
+    previous = load_path(flat_file)
+    previous_time = previous.get("_meta", {}).get("exported_at")
+    if previous_time is None:
+        return
+    new_time = flat_output["_meta"]["exported_at"]
+    flat_output["_meta"]["exported_at"] = previous_time
+    if previous != flat_output:
+        flat_output["_meta"]["exported_at"] = new_time
+
+def export_gear_optimizer(lang, translations, source_index, dry_run=False):
     """
     Export translations for gear_optimizer in vue-i18n format.
+    source_index comes from build_export_index().
 
     Output format:
     {
@@ -54,84 +104,63 @@ def export_gear_optimizer(lang, translations, source_data, dry_run=False):
     }
     """
     output = {}
+    flat_strings = {}
     exported_count = 0
 
-    for section_name, section_data in source_data["sections"].items():
-        if not section_name.startswith("gear_optimizer/"):
+    # Build the nested and flat outputs in one pass over the source strings
+    for string_id, english_text, parent_keys, leaf_key in source_index:
+        # Check if we have a translation
+        trans_entry = translations.get(string_id)
+        if trans_entry is None:
             continue
 
-        for string_data in section_data["strings"]:
-            string_id = string_data["id"]
+        # Only export approved, submitted or draft translations
+        status = trans_entry.get("status")
+        if status not in _OK_STATUSES:
+            continue
+
+        text = trans_entry.get("text", "")
+
+        # Build nested structure
+        leaf = reduce(lambda node, part: node.setdefault(part, {}), parent_keys, output)
+        leaf[leaf_key] = text
+        exported_count += 1
+
+        # Also create a flat version for easier lookup
+        flat_strings[string_id] = {
+            "en": english_text,
+            lang: text,
+            "status": status
+        }
 
-            # Check if we have a translation
-            if string_id in translations:
-                trans_entry = translations[string_id]
-                # Only export approved or submitted translations
-                if trans_entry.get("status") in ["approved", "submitted", "draft"]:
-                    # Convert dot notation to nested dict
-                    # e.g., "gear_optimizer.vue.layout.AppHeader.0" -> nested structure
-                    keys = string_id.split(".")
-
-                    # Simplify the key structure for vue-i18n
-                    # Take the last meaningful parts
-                    if len(keys) >= 3:
-                        category = keys[-2] if keys[-2] not in ["header", "paragraph", "list_item"] else keys[-3]
-                        index = keys[-1]
-                        simple_key = f"{category}.{index}"
-                    else:
-                        simple_key = string_id
-
-                    # Build nested structure
-                    current = output
-                    key_parts = simple_key.split(".")
-                    for part in key_parts[:-1]:
-                        if part not in current:
-                            current[part] = {}
-                        current = current[part]
-                    current[key_parts[-1]] = trans_entry.get("text", "")
-                    exported_count += 1
-
-    # Also create a flat version for easier lookup
     flat_output = {
         "_meta": {
             "language": lang,
             "exported_at": datetime.now().isoformat(),
             "string_count": exported_count
         },
-        "strings": {}
+        "strings": flat_strings
     }
 
-    for section_name, section_data in source_data["sections"].items():
-        if not section_name.startswith("gear_optimizer/"):
-            continue
-        for string_data in section_data["strings"]:
-            string_id = string_data["id"]
-            if string_id in translations:
-                trans_entry = translations[string_id]
-                if trans_entry.get("status") in ["approved", "submitted", "draft"]:
-                    flat_output["strings"][string_id] = {
-                        "en": string_data["en"],
-                        lang: trans_entry.get("text", ""),
-                        "status": trans_entry.get("status")
-                    }
-
     # Output paths
     locales_dir = GEAR_OPTIMIZER_PATH / "src" / "locales"
 
     if not dry_run:
         locales_dir.mkdir(parents=True, exist_ok=True)
 
-        # Write nested format (for vue-i18n)
+        # Write nested format (for vue-i18n), skipping files that haven't changed
         nested_file = locales_dir / f"{lang}.json"
-        with open(nested_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        nested_written = save_path_if_changed(nested_file, output)
 
         # Write flat format (for easy lookup)
         flat_file = locales_dir / f"{lang}-flat.json"
-        with open(flat_file, 'w', encoding='utf-8') as f:
-            json.dump(flat_output, f, indent=2, ensure_ascii=False)
+        keep_export_time(flat_file, flat_output)
+        flat_written = save_path_if_changed(flat_file, flat_output)
 
-        print(f"  Exported {exported_count} strings to {nested_file}")
+        if nested_written or flat_written:
+            print(f"  Exported {exported_count} strings to {nested_file}")
+        else:
+            print(f"  Unchanged: {exported_count} strings already in {nested_file}")
     else:
         print(f"  [DRY RUN] Would export {exported_count} strings to {locales_dir}/{lang}.json")
 
@@ -149,10 +178,12 @@ def main():
     print("EXPORT TRANSLATIONS")
     print("=" * 60)
 
-    source_data = load_source_strings()
-    print(f"Loaded {source_data['meta']['total_strings']} source strings")
+    source_meta = load_meta(SOURCE_STRINGS)
+    print(f"Loaded {source_meta['total_strings']} source strings")
     print()
 
+    source_index = build_export_index(SOURCE_STRINGS)
+
     total_exported = 0
 
     for lang in languages:
@@ -174,7 +205,7 @@ def main():
             print(f"    - {status}: {count}")
 
         # Export to gear_optimizer
-        gear_count = export_gear_optimizer(lang, translations, source_data, args.dry_run)
+        gear_count = export_gear_optimizer(lang, translations, source_index, args.dry_run)
         total_exported += gear_count
 
     print(f"\n{'=' * 60}")
@@ -6,16 +6,19 @@ Generates source-strings.json with all text to translate.
 Usage:
     python3 scripts/extract_strings.py
     python3 scripts/extract_strings.py --sync  # Compare with previous extraction
+    python3 scripts/extract_strings.py --full  # Re-extract unchanged files too
 """
 
-import json
 import re
 import os
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import argparse
 
+from fastjson import iter_sections, load_meta, save_path_streamed
+
 # Source repositories
 GEAR_OPTIMIZER_PATH = Path("/Users/albertajstamper/dev/gear_optimizer")
 OUTPUT_PATH = Path("/Users/albertajstamper/dev/translation-portal/data")
@@ -27,22 +30,115 @@ EXCLUDED_FILES = {
     "CHANGELOG.md",   # Dev changelog (different from user-facing release notes)
 }
 
+# Threads reading source files, and files handed to each worker process at a time
+READ_WORKERS = 16
+EXTRACT_CHUNKSIZE = 8
+
+# Compiled once at import - the extractors run these on every file
+
+# Vue templates
+_TEMPLATE_RE = re.compile(r'<template[^>]*>(.*?)</template>', re.DOTALL)
+_VUE_TEXT_RE = re.compile(r'>([^<>{}\n]+?)<')
+_VUE_CODE_RE = re.compile(r'^[\d\.\-\+\*\/\%\$\#\@]+$')
+_VUE_ATTRS_RE = re.compile(r'(?:placeholder|title|aria-label|label)="([^"]+)"')
+
+# Markdown
+_MD_HEADER_RE = re.compile(r'^#+\s*')
+_MD_NUMBERED_ITEM_RE = re.compile(r'^\d+\.\s')
+_MD_LIST_MARKER_RE = re.compile(r'^[-\*\d\.]+\s*')
+
+# Jinja templates (skip {{ }} and {% %} blocks)
+_JINJA_TEXT_RE = re.compile(r'>([^<>{%}]+?)<')
+_JINJA_CODE_RE = re.compile(r'^[\s\d\.\-\+\*\/\%\$\#\@\&\;]+$')
+_JINJA_ATTRS_RE = re.compile(r'(?:placeholder|title|aria-label)="([^"{%]+)"')
+
+# Algorithm behind each string's "hash". Translations store it as
+# source_hash to flag changed English text, so switching algorithms
+# would mark every existing translation as outdated.
+HASH_ALGO = "md5"
+
+# Version of the extraction logic. Bump this whenever extraction output can
+# change (patterns, filtering in the extract_* functions, the id scheme) so
+# the next run re-extracts every file instead of reusing prior sections.
+EXTRACTOR_VERSION = 1
+
 def hash_string(s):
     """Create short hash of string for change detection."""
     return hashlib.md5(s.encode()).hexdigest()[:8]
 
-def extract_vue_strings(file_path):
-    """Extract translatable strings from Vue components."""
-    strings = []
+def read_source_file(file_path):
+    """
+    Read a source file, returning (file_hash, text).
 
+    file_hash is the MD5 of the raw bytes, used to tell whether the file
+    changed since the last extraction. text is None if the file can't be
+    decoded as UTF-8; both are None if it can't be read.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except:
-        return strings
+        data = file_path.read_bytes()
+    except OSError:
+        return None, None
+    digest = hashlib.md5(data).hexdigest()
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return digest, None
+    # Normalize line endings the way text-mode open() does
+    return digest, text.replace('\r\n', '\n').replace('\r', '\n')
+
+def columns_from_strings(strings):
+    """Split a list of string entries into parallel per-field lists."""
+    if not strings:
+        return {}
+    return {field: [s[field] for s in strings] for field in strings[0]}
+
+def section_for_output(section):
+    """
+    Build a section in the source-strings.json layout.
+
+    Sections keep their strings as parallel "columns" lists while
+    extracting; the per-string dicts are only created here, one section
+    at a time, as the file is written.
+    """
+    out = {k: v for k, v in section.items() if k != "columns"}
+    columns = section["columns"]
+    fields = list(columns)
+    out["strings"] = [dict(zip(fields, row)) for row in zip(*columns.values())]
+    return out
+
+def load_prior_sections():
+    """Load gear_optimizer sections from the previous source-strings.json."""
+    prior_file = OUTPUT_PATH / "source-strings.json"
+    if not prior_file.exists():
+        return {}
+    meta = load_meta(prior_file)
+    # Files written before hash_algo was recorded always used md5
+    if meta.get("hash_algo", "md5") != HASH_ALGO:
+        return {}
+    # Sections from another extractor version may not match current output
+    if meta.get("extractor_version") != EXTRACTOR_VERSION:
+        return {}
+    prior_sections = {}
+    for name, section in iter_sections(prior_file):
+        if name.startswith("gear_optimizer/"):
+            section["columns"] = columns_from_strings(section.pop("strings"))
+            prior_sections[name.removeprefix("gear_optimizer/")] = section
+    return prior_sections
+
+def reuse_prior_section(prior_sections, section_name, rel_path, digest):
+    """Return the previous extraction of a file if its contents are unchanged."""
+    prior = prior_sections.get(section_name)
+    if (prior and digest and prior.get("file_hash") == digest
+            and prior.get("source_file") == str(rel_path)):
+        return prior
+    return None
+
+def extract_vue_strings(content):
+    """Extract translatable strings from a Vue component's source."""
+    strings = []
 
     # Extract from <template> section
-    template_match = re.search(r'<template[^>]*>(.*?)</template>', content, re.DOTALL)
+    template_match = _TEMPLATE_RE.search(content)
     if template_match:
         template = template_match.group(1)
 
@@ -53,39 +149,25 @@ def extract_vue_strings(file_path):
         # 4. aria-label: aria-label="Text"
 
         # Pattern: >Text content< (excluding {{ }} interpolations for now)
-        text_pattern = r'>([^<>{}\n]+?)<'
-        for match in re.finditer(text_pattern, template):
+        for match in _VUE_TEXT_RE.finditer(template):
             text = match.group(1).strip()
             if text and len(text) > 1 and not text.startswith(':') and not text.startswith('@'):
                 # Filter out things that look like code
-                if not re.match(r'^[\d\.\-\+\*\/\%\$\#\@]+$', text):
+                if not _VUE_CODE_RE.match(text):
                     strings.append(text)
 
-        # Pattern: placeholder="Text"
-        attr_patterns = [
-            r'placeholder="([^"]+)"',
-            r'title="([^"]+)"',
-            r'aria-label="([^"]+)"',
-            r'label="([^"]+)"',
-        ]
-        for pattern in attr_patterns:
-            for match in re.finditer(pattern, template):
-                text = match.group(1).strip()
-                if text and not text.startswith(':') and not text.startswith('{'):
-                    strings.append(text)
+        # Pattern: placeholder="Text" (and title, aria-label, label) in one pass
+        for match in _VUE_ATTRS_RE.finditer(template):
+            text = match.group(1).strip()
+            if text and not text.startswith(':') and not text.startswith('{'):
+                strings.append(text)
 
     return list(set(strings))  # Dedupe
 
-def extract_markdown_strings(file_path):
-    """Extract translatable strings from Markdown files."""
+def extract_markdown_strings(content):
+    """Extract translatable strings from a Markdown file's source."""
     strings = []
 
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except:
-        return strings
-
     # For markdown, we extract:
     # 1. Headers (lines starting with #)
     # 2. Paragraphs (blocks of text)
@@ -99,13 +181,13 @@ def extract_markdown_strings(file_path):
 
         # Headers
         if stripped.startswith('#'):
-            header_text = re.sub(r'^#+\s*', '', stripped)
+            header_text = _MD_HEADER_RE.sub('', stripped)
             if header_text:
                 strings.append(('header', header_text))
 
         # List items
-        elif stripped.startswith('- ') or stripped.startswith('* ') or re.match(r'^\d+\.\s', stripped):
-            item_text = re.sub(r'^[-\*\d\.]+\s*', '', stripped)
+        elif stripped.startswith('- ') or stripped.startswith('* ') or _MD_NUMBERED_ITEM_RE.match(stripped):
+            item_text = _MD_LIST_MARKER_RE.sub('', stripped)
             if item_text:
                 strings.append(('list_item', item_text))
 
@@ -147,83 +229,122 @@ def extract_jinja_strings(file_path):
 
     # Skip Jinja blocks {{ }} and {% %}
     # Pattern: >Text< but not {{ or {%
-    text_pattern = r'>([^<>{%}]+?)<'
-    for match in re.finditer(text_pattern, content):
+    for match in _JINJA_TEXT_RE.finditer(content):
         text = match.group(1).strip()
         if text and len(text) > 1:
             # Filter out whitespace-only and code-like strings
-            if not re.match(r'^[\s\d\.\-\+\*\/\%\$\#\@\&\;]+$', text):
+            if not _JINJA_CODE_RE.match(text):
                 if not text.startswith('{{') and not text.startswith('{%'):
                     strings.append(text)
 
-    # Placeholder and title attributes
-    attr_patterns = [
-        r'placeholder="([^"{%]+)"',
-        r'title="([^"{%]+)"',
-        r'aria-label="([^"{%]+)"',
-    ]
-    for pattern in attr_patterns:
-        for match in re.finditer(pattern, content):
-            text = match.group(1).strip()
-            if text:
-                strings.append(text)
+    # Placeholder, title and aria-label attributes in one pass
+    for match in _JINJA_ATTRS_RE.finditer(content):
+        text = match.group(1).strip()
+        if text:
+            strings.append(text)
 
     return list(set(strings))
 
-def extract_gear_optimizer():
-    """Extract all strings from gear_optimizer repo."""
+def extract_gear_optimizer(prior_sections=None):
+    """
+    Extract all strings from gear_optimizer repo.
+
+    Files whose contents match the file_hash recorded in prior_sections
+    keep their previous strings (ids and hashes) without re-extracting.
+    The remaining files are extracted in parallel across CPU cores.
+    """
     sections = {}
+    prior_sections = prior_sections or {}
 
-    # 1. Vue Components
     vue_dir = GEAR_OPTIMIZER_PATH / "src" / "components"
-    if vue_dir.exists():
-        for vue_file in vue_dir.rglob("*.vue"):
-            rel_path = vue_file.relative_to(GEAR_OPTIMIZER_PATH)
-            section_name = f"vue/{rel_path.parent.name}/{vue_file.stem}"
-
-            strings = extract_vue_strings(vue_file)
-            if strings:
-                sections[section_name] = {
-                    "source_file": str(rel_path),
-                    "type": "vue_component",
-                    "strings": []
-                }
-                for i, text in enumerate(strings):
-                    string_id = f"{section_name.replace('/', '.')}.{i}"
-                    sections[section_name]["strings"].append({
-                        "id": string_id,
-                        "en": text,
-                        "chars": len(text),
-                        "hash": hash_string(text)
-                    })
+    vue_paths = list(vue_dir.rglob("*.vue")) if vue_dir.exists() else []
 
-    # 2. Markdown Content
     content_dir = GEAR_OPTIMIZER_PATH / "content"
+    md_paths = []
     if content_dir.exists():
-        for md_file in content_dir.rglob("*.md"):
-            # Skip excluded files (developer documentation)
-            if md_file.name in EXCLUDED_FILES:
-                continue
-
-            rel_path = md_file.relative_to(GEAR_OPTIMIZER_PATH)
-            section_name = f"content/{md_file.stem}"
-
-            strings = extract_markdown_strings(md_file)
-            if strings:
-                sections[section_name] = {
-                    "source_file": str(rel_path),
-                    "type": "markdown",
-                    "strings": []
+        # Skip excluded files (developer documentation)
+        md_paths = [p for p in content_dir.rglob("*.md") if p.name not in EXCLUDED_FILES]
+
+    # Read every file up front on a thread pool so the reads overlap
+    all_paths = vue_paths + md_paths
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        file_contents = dict(zip(all_paths, executor.map(read_source_file, all_paths)))
+
+    # Collect files as (path, rel_path, section_name, digest, prior section)
+    vue_files = []
+    for vue_file in vue_paths:
+        rel_path = vue_file.relative_to(GEAR_OPTIMIZER_PATH)
+        section_name = f"vue/{rel_path.parent.name}/{vue_file.stem}"
+        digest = file_contents[vue_file][0]
+        prior = reuse_prior_section(prior_sections, section_name, rel_path, digest)
+        vue_files.append((vue_file, rel_path, section_name, digest, prior))
+
+    md_files = []
+    for md_file in md_paths:
+        rel_path = md_file.relative_to(GEAR_OPTIMIZER_PATH)
+        section_name = f"content/{md_file.stem}"
+        digest = file_contents[md_file][0]
+        prior = reuse_prior_section(prior_sections, section_name, rel_path, digest)
+        md_files.append((md_file, rel_path, section_name, digest, prior))
+
+    # Extract changed files in worker processes (regex work is CPU-bound)
+    vue_todo = [f[0] for f in vue_files if f[4] is None and file_contents[f[0]][1] is not None]
+    md_todo = [f[0] for f in md_files if f[4] is None and file_contents[f[0]][1] is not None]
+    vue_results = {}
+    md_results = {}
+    if vue_todo or md_todo:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            vue_iter = executor.map(extract_vue_strings, [file_contents[p][1] for p in vue_todo],
+                                    chunksize=EXTRACT_CHUNKSIZE)
+            md_iter = executor.map(extract_markdown_strings, [file_contents[p][1] for p in md_todo],
+                                   chunksize=EXTRACT_CHUNKSIZE)
+            vue_results = dict(zip(vue_todo, vue_iter))
+            md_results = dict(zip(md_todo, md_iter))
+
+    # 1. Vue Components
+    for vue_file, rel_path, section_name, digest, prior in vue_files:
+        if prior:
+            sections[section_name] = prior
+            continue
+
+        texts = vue_results.get(vue_file)
+        if texts:
+            id_prefix = section_name.replace('/', '.')
+            sections[section_name] = {
+                "source_file": str(rel_path),
+                "type": "vue_component",
+                "file_hash": digest,
+                "columns": {
+                    "id": [f"{id_prefix}.{i}" for i in range(len(texts))],
+                    "en": texts,
+                    "chars": [len(text) for text in texts],
+                    "hash": [hash_string(text) for text in texts]
                 }
-                for i, (str_type, text) in enumerate(strings):
-                    string_id = f"{section_name.replace('/', '.')}.{str_type}.{i}"
-                    sections[section_name]["strings"].append({
-                        "id": string_id,
-                        "en": text,
-                        "chars": len(text),
-                        "hash": hash_string(text),
-                        "context": str_type
-                    })
+            }
+
+    # 2. Markdown Content
+    for md_file, rel_path, section_name, digest, prior in md_files:
+        if prior:
+            sections[section_name] = prior
+            continue
+
+        strings = md_results.get(md_file)
+        if strings:
+            id_prefix = section_name.replace('/', '.')
+            str_types = [str_type for str_type, _ in strings]
+            texts = [text for _, text in strings]
+            sections[section_name] = {
+                "source_file": str(rel_path),
+                "type": "markdown",
+                "file_hash": digest,
+                "columns": {
+                    "id": [f"{id_prefix}.{str_type}.{i}" for i, str_type in enumerate(str_types)],
+                    "en": texts,
+                    "chars": [len(text) for text in texts],
+                    "hash": [hash_string(text) for text in texts],
+                    "context": str_types
+                }
+            }
 
     return sections
 
@@ -234,15 +355,16 @@ def calculate_stats(data):
     total_chars = 0
 
     for section in data["sections"].values():
-        for s in section["strings"]:
-            total_strings += 1
-            total_chars += s["chars"]
+        chars = section["columns"].get("chars", [])
+        total_strings += len(chars)
+        total_chars += sum(chars)
 
     return total_strings, total_chars
 
 def main():
     parser = argparse.ArgumentParser(description='Extract translatable strings')
     parser.add_argument('--sync', action='store_true', help='Compare with previous extraction')
+    parser.add_argument('--full', action='store_true', help='Re-extract every file, even if unchanged')
     args = parser.parse_args()
 
     OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
@@ -251,9 +373,12 @@ def main():
     print("STRING EXTRACTION")
     print("=" * 60)
 
+    # Reuse strings from unchanged files unless a full extraction is requested
+    prior_sections = {} if args.full else load_prior_sections()
+
     # Extract from gear_optimizer only
     print("\nExtracting from gear_optimizer...")
-    gear_sections = extract_gear_optimizer()
+    gear_sections = extract_gear_optimizer(prior_sections)
 
     # Build sections
     all_sections = {f"gear_optimizer/{k}": v for k, v in gear_sections.items()}
@@ -263,7 +388,9 @@ def main():
         "meta": {
             "extracted_at": datetime.now().isoformat(),
             "version": datetime.now().strftime("%Y%m%d_%H%M%S"),
-            "sources": [str(GEAR_OPTIMIZER_PATH)]
+            "sources": [str(GEAR_OPTIMIZER_PATH)],
+            "hash_algo": HASH_ALGO,
+            "extractor_version": EXTRACTOR_VERSION
         },
         "sections": all_sections
     }
@@ -275,8 +402,7 @@ def main():
 
     # Save
     output_file = OUTPUT_PATH / "source-strings.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    save_path_streamed(output_file, output, "sections", section_for_output)
 
     print(f"\n{'=' * 60}")
     print("EXTRACTION COMPLETE")
@@ -299,8 +425,7 @@ def main():
 
         # Save new snapshot
         snapshot_file = snapshot_dir / f"source-strings-{output['meta']['version']}.json"
-        with open(snapshot_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        save_path_streamed(snapshot_file, output, "sections", section_for_output)
         print(f"Snapshot saved: {snapshot_file}")
 
     # Print section summary
@@ -308,8 +433,9 @@ def main():
     print("SECTIONS")
     print(f"{'=' * 60}")
     for section_name, section_data in sorted(all_sections.items()):
-        string_count = len(section_data["strings"])
-        char_count = sum(s["chars"] for s in section_data["strings"])
+        chars = section_data["columns"].get("chars", [])
+        string_count = len(chars)
+        char_count = sum(chars)
         print(f"  {section_name}: {string_count} strings ({char_count:,} chars)")
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+"""
+JSON helpers shared by the scripts.
+
+Files are parsed and written with orjson when it is installed, falling
+back to the stdlib json module. Both produce the same output: 2-space
+indent, UTF-8, non-ASCII left unescaped. save_path_streamed writes one
+large member entry by entry instead of serializing the whole document.
+
+source-strings.json is read one section at a time with ijson when it is
+installed, so only the current section is held in memory. Without ijson
+the whole file is loaded as before.
+"""
+
+import json
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj):
+    """Serialize obj as indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def load_path(path):
+    """Load a JSON file."""
+    return loads(Path(path).read_bytes())
+
+def save_path(path, obj):
+    """Write obj to a JSON file."""
+    Path(path).write_bytes(dumps(obj))
+
+def save_path_if_changed(path, obj):
+    """
+    Write obj to a JSON file only if that changes its contents, so no-op
+    runs leave the file (and its modification time) alone.
+    Returns True if the file was written.
+    """
+    path = Path(path)
+    data = dumps(obj)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+def _indent(data, prefix):
+    """Shift serialized JSON right so it can be nested under another object."""
+    return data.replace(b'\n', b'\n' + prefix)
+
+def save_path_streamed(path, obj, stream_key, transform=None):
+    """
+    Write obj to a JSON file exactly as save_path would, but serialize the
+    entries of obj[stream_key] one at a time so the whole document is never
+    held in memory as a single string. If given, transform(entry) is
+    applied to each streamed entry just before it is serialized.
+    """
+    with open(path, 'wb') as f:
+        f.write(b'{')
+        for i, (key, value) in enumerate(obj.items()):
+            f.write(b',\n  ' if i else b'\n  ')
+            f.write(dumps(key) + b': ')
+            if key == stream_key and isinstance(value, dict) and value:
+                f.write(b'{')
+                for j, (entry_key, entry) in enumerate(value.items()):
+                    f.write(b',\n    ' if j else b'\n    ')
+                    f.write(dumps(entry_key) + b': ')
+                    if transform is not None:
+                        entry = transform(entry)
+                    f.write(_indent(dumps(entry), b'    '))
+                f.write(b'\n  }')
+            else:
+                f.write(_indent(dumps(value), b'  '))
+        f.write(b'\n}' if obj else b'}')
+
+def iter_sections(path):
+    """Yield (section_name, section_data) pairs from a source-strings file."""
+    with open(path, 'rb') as f:
+        if ijson is None:
+            yield from loads(f.read())["sections"].items()
+        else:
+            yield from ijson.kvitems(f, 'sections', use_float=True)
+
+def load_meta(path):
+    """Read just the "meta" block of a source-strings file."""
+    with open(path, 'rb') as f:
+        if ijson is None:
+            return loads(f.read())["meta"]
+        # "meta" comes first, so this stops before parsing the sections
+        return next(ijson.items(f, 'meta', use_float=True))